@@ -1,13 +1,42 @@
 import json
 import os
+import sys
 import datetime
 import textwrap
 import random
+import bisect
+import atexit
+
+try:
+    import orjson  # optional, faster encode/decode of the snapshot
+except ImportError:
+    orjson = None
+
+try:
+    from sortedcontainers import SortedList  # optional, presorted pending views
+except ImportError:
+    SortedList = None
 
 DATA_FILE = "data.json"
+LOG_FILE = "data.jsonl"  # append-only event log replayed on top of DATA_FILE
+LOG_COMPACT_LINES = 50
+FLUSH_EVERY = 8  # buffered mutations before the log is written
+SEARCH_CACHE_SIZE = 32
+# set to fall back to cls/clear on terminals without ANSI support
+LEGACY_CLEAR = bool(os.environ.get("STUDY_PLANNER_LEGACY_CLEAR"))
 XP_PER_TASK = 20
 XP_TO_LEVEL = 100
+# sorted thresholds, parallel to the achievement names they unlock
+MILESTONE_THRESHOLDS = [1, 5, 10, 25]
+MILESTONE_NAMES = ["First Task Done", "Getting Serious", "Study Machine", "Legendary Studier"]
+LEVEL_THRESHOLDS = [2, 5]
+LEVEL_NAMES = ["Level 2 Achieved", "Level 5 Achieved"]
+# Task attributes an "edit" log event may change
+LOGGED_EDIT_FIELDS = ("title", "category", "due_date", "priority", "notes", "created_at", "completed_at")
 class Task:
+    __slots__ = ("id", "title", "category", "due_date", "priority", "notes",
+                 "created_at", "completed_at", "_due_dt")
+
     def __init__(self, title, category="General", due_date=None, priority=3, notes=""):
         self.id = None  # assigned by Planner
         self.title = title
@@ -17,6 +46,17 @@ class Task:
         self.notes = notes
         self.created_at = datetime.datetime.now().isoformat()
         self.completed_at = None
+        self._due_dt = Task._parse_due(due_date)  # parsed once for sorting
+
+    @staticmethod
+    def _parse_due(due_date):
+        # a plain date keeps keys comparable even if a stored value carries a time or offset
+        if not due_date:
+            return datetime.date.max
+        try:
+            return datetime.datetime.fromisoformat(due_date).date()
+        except (TypeError, ValueError):
+            return datetime.date.max
 
     def to_dict(self):
         return {
@@ -31,10 +71,11 @@ class Task:
         }
 
     @staticmethod
-    def from_dict(d):
+    def from_dict(d, tid=None):
         t = Task(d["title"], d.get("category", "General"),
                  d.get("due_date"), d.get("priority", 3), d.get("notes", ""))
-        t.id = d.get("id")
+        # the storage key wins over the stored "id" field
+        t.id = tid if tid is not None else d.get("id")
         t.created_at = d.get("created_at", t.created_at)
         t.completed_at = d.get("completed_at")
         return t
@@ -48,31 +89,244 @@ class Planner:
         self.xp = 0
         self.level = 1
         self.achievements = set()
+        self._by_id = {}
+        self._pending_ids = set()
+        self._completed_ids = set()
+        self._pending_count = 0
+        self._completed_count = 0
+        self._by_priority = None  # SortedList of pending tasks, when available
+        self._by_due = None
+        self._haystack = {}     # id -> casefolded searchable text
+        self._search_cache = {}  # casefolded keyword -> results
+        self._view_cache = {}   # (show_completed, sort_by) -> sorted items
+        self._view_dirty = True
+        self._log_lines = 0
+        self._log_gen = 0  # bumped on every snapshot; the log header must match it
+        self._pending_events = []  # encoded log lines not yet on disk
+        self._mutations_since_save = 0
+        self._dirty = False
+        # values seen by the last achievement check
+        self._last_completed_count = 0
+        self._last_level = 0
         self.load()
 
-    
+
     def load(self):
         if not os.path.exists(DATA_FILE):
             self._create_default_file()
         try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.next_id = data.get("next_id", 1)
-            self.xp = data.get("xp", 0)
-            self.level = data.get("level", 1)
-            self.achievements = set(data.get("achievements", []))
-            self.tasks = {int(k): Task.from_dict(v) for k, v in data.get("tasks", {}).items()}
-            self.completed = {int(k): Task.from_dict(v) for k, v in data.get("completed", {}).items()}
-            # restore ids inside tasks
-            for tid, t in {**self.tasks, **self.completed}.items():
-                t.id = tid
-        except Exception as e:
+            # parse straight from the read so the raw bytes are freed right away
+            with open(DATA_FILE, "rb") as f:
+                data = orjson.loads(f.read()) if orjson else json.loads(f.read())
+        except ValueError as e:
+            # keep the unreadable files for inspection instead of overwriting them
             print("Error loading data file:", e)
-            print("Creating fresh data file.")
+            print(f"Moved it to {DATA_FILE}.bad and created a fresh data file.")
+            os.replace(DATA_FILE, DATA_FILE + ".bad")
+            if os.path.exists(LOG_FILE):
+                os.replace(LOG_FILE, LOG_FILE + ".bad")
             self._create_default_file()
+            return
+        self.next_id = data.get("next_id", 1)
+        self.xp = data.get("xp", 0)
+        self.level = data.get("level", 1)
+        self.achievements = set(data.get("achievements", []))
+        self._log_gen = data.get("log_gen", 0)
+        self.tasks = {int(k): Task.from_dict(v, int(k)) for k, v in data.get("tasks", {}).items()}
+        self.completed = {int(k): Task.from_dict(v, int(k)) for k, v in data.get("completed", {}).items()}
+        self._rebuild_index()
+        self._replay_log()
+
+    def _rebuild_index(self):
+        self._by_id = {**self.tasks, **self.completed}
+        self._pending_ids = set(self.tasks)
+        self._completed_ids = set(self.completed)
+        self._pending_count = len(self.tasks)
+        self._completed_count = len(self.completed)
+        if SortedList is not None:
+            self._by_priority = SortedList(self.tasks.values(), key=lambda t: (t.priority, t.id))
+            self._by_due = SortedList(self.tasks.values(), key=lambda t: (t._due_dt, t.id))
+        self._view_dirty = True
+        self._search_cache.clear()
+        self._haystack = {}
+        for t in self._by_id.values():
+            self._index_haystack(t)
+
+    def _sorted_add(self, t):
+        if self._by_priority is not None:
+            self._by_priority.add(t)
+            self._by_due.add(t)
+
+    def _sorted_discard(self, t):
+        # must run before the task's sort fields change
+        if self._by_priority is not None:
+            self._by_priority.discard(t)
+            self._by_due.discard(t)
+
+    def _index_haystack(self, t):
+        self._haystack[t.id] = (t.title + "\0" + t.notes + "\0" + t.category).casefold()
+
+    def _iter_log_events(self):
+        # yield (end offset, event) one line at a time; the log is never held in memory
+        if not os.path.exists(LOG_FILE):
+            return
+        end = 0
+        with open(LOG_FILE, "rb") as f:
+            for line in f:
+                end += len(line)
+                if not line.endswith(b"\n"):
+                    return  # torn last line from an interrupted write
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    return
+                yield end, event
+
+    def _replay_log(self):
+        # apply events written since the last snapshot
+        self._log_lines = 0
+        good_end = 0
+        for end, event in self._iter_log_events():
+            try:
+                if event["op"] == "gen":
+                    if event["gen"] != self._log_gen:
+                        good_end = 0  # written before the current snapshot, already folded in
+                        break
+                else:
+                    self._apply_event(event)
+                    self._log_lines += 1
+            except (KeyError, TypeError, ValueError, AttributeError):
+                break  # not a valid event; drop it and the rest, as for a torn line
+            good_end = end
+        if good_end == 0:
+            self._reset_log()
+        elif os.path.getsize(LOG_FILE) > good_end:
+            # drop the damaged tail so later appends don't land after it
+            with open(LOG_FILE, "r+b") as f:
+                f.truncate(good_end)
+
+    def _reset_log(self):
+        # start an empty log tagged with the current snapshot generation
+        with open(LOG_FILE, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "gen", "gen": self._log_gen}) + "\n")
+        self._log_lines = 0
+
+    def _apply_event(self, event):
+        # read everything an event needs before touching state, so a
+        # malformed one raises without leaving a half-applied change
+        op = event["op"]
+        if op == "add":
+            t = Task.from_dict(event["task"])
+            self.next_id = max(self.next_id, t.id + 1)
+            if t.id not in self._by_id:  # otherwise already in the snapshot
+                self._insert_pending(t)
+        elif op == "edit":
+            fields = dict(event["fields"])
+            for k, v in fields.items():
+                if k not in LOGGED_EDIT_FIELDS:
+                    raise KeyError(k)
+                if k == "priority":
+                    fields[k] = int(v)
+                elif v is not None and not isinstance(v, str):
+                    raise TypeError(k)
+            t = self.get_task(event["id"])
+            if t:
+                self._set_fields(t, fields)
+        elif op == "delete":
+            self._remove(event["id"])
+        elif op == "complete":
+            completed_at = event["completed_at"]
+            xp, level = int(event["xp"]), int(event["level"])
+            achievements = set(event["achievements"])
+            t = self.tasks.get(event["id"])
+            if t:
+                self._move_to_completed(t, completed_at)
+            self.xp = xp
+            self.level = level
+            self.achievements = achievements
+        else:
+            raise KeyError(op)
+
+    # index bookkeeping shared by the live methods and log replay
+
+    def _insert_pending(self, t):
+        self._index_haystack(t)  # first: raises on bad field types before anything changes
+        self.tasks[t.id] = t
+        self._by_id[t.id] = t
+        self._pending_ids.add(t.id)
+        self._pending_count += 1
+        self._sorted_add(t)
+
+    def _remove(self, task_id):
+        t = self._by_id.pop(task_id, None)
+        if t is None:
+            return None
+        self._haystack.pop(task_id, None)
+        if task_id in self._pending_ids:
+            self._pending_ids.discard(task_id)
+            self._sorted_discard(t)
+            del self.tasks[task_id]
+            self._pending_count -= 1
+        else:
+            self._completed_ids.discard(task_id)
+            del self.completed[task_id]
+            self._completed_count -= 1
+        return t
+
+    def _move_to_completed(self, t, completed_at):
+        self._sorted_discard(t)
+        del self.tasks[t.id]
+        t.completed_at = completed_at
+        self.completed[t.id] = t
+        self._pending_ids.discard(t.id)
+        self._completed_ids.add(t.id)
+        self._pending_count -= 1
+        self._completed_count += 1
+
+    def _set_fields(self, t, fields):
+        pending = t.id in self._pending_ids
+        if pending:
+            self._sorted_discard(t)
+        for k, v in fields.items():
+            setattr(t, k, v)
+        if "due_date" in fields:
+            t._due_dt = Task._parse_due(t.due_date)
+        if pending:
+            self._sorted_add(t)
+        self._index_haystack(t)
+
+    def _append_event(self, event):
+        self._pending_events.append(json.dumps(event, ensure_ascii=False) + "\n")
+        self._mutations_since_save += 1
+        self._dirty = True
+        self._view_dirty = True
+        self._search_cache.clear()
+        if self._mutations_since_save >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        # write buffered events to the log in one go
+        if not self._dirty:
+            return
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write("".join(self._pending_events))
+        self._log_lines += len(self._pending_events)
+        self._pending_events = []
+        self._mutations_since_save = 0
+        self._dirty = False
+        self.compact()
+
+    def compact(self):
+        # fold the event log into a fresh snapshot once it grows too long
+        if self._log_lines >= LOG_COMPACT_LINES:
+            self.save()
 
     def save(self):
+        self._log_gen += 1
         data = {
+            "log_gen": self._log_gen,
             "next_id": self.next_id,
             "xp": self.xp,
             "level": self.level,
@@ -80,8 +334,23 @@ class Planner:
             "tasks": {tid: task.to_dict() for tid, task in self.tasks.items()},
             "completed": {tid: task.to_dict() for tid, task in self.completed.items()},
         }
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson:
+            payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # write to a temp file and swap it in so a crash never leaves a half-written snapshot
+        tmp = DATA_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, DATA_FILE)
+        # the snapshot now includes every logged event; if we crash before the
+        # log is reset, its old generation tag makes load() skip it
+        self._reset_log()
+        self._pending_events = []
+        self._mutations_since_save = 0
+        self._dirty = False
 
     def _create_default_file(self):
         self.next_id = 1
@@ -90,59 +359,64 @@ class Planner:
         self.tasks = {}
         self.completed = {}
         self.achievements = set()
+        self._rebuild_index()
         self.save()
 
     def add_task(self, title, category="General", due_date=None, priority=3, notes=""):
         t = Task(title, category, due_date, priority, notes)
         t.id = self.next_id
-        self.tasks[self.next_id] = t
+        self._insert_pending(t)
         self.next_id += 1
-        self.save()
+        self._append_event({"op": "add", "task": t.to_dict()})
         return t.id
 
     def view_tasks(self, show_completed=False, sort_by="priority"):
+        if self._view_dirty:
+            self._view_cache.clear()
+            self._view_dirty = False
+        key = (show_completed, sort_by)
+        if key in self._view_cache:
+            return list(self._view_cache[key])
+        if not show_completed and self._by_priority is not None and sort_by in ("priority", "due"):
+            index = self._by_priority if sort_by == "priority" else self._by_due
+            items = [(t.id, t) for t in index]
+            self._view_cache[key] = items
+            return list(items)
         items = list(self.completed.items()) if show_completed else list(self.tasks.items())
         if not items:
             return []
         if sort_by == "priority":
             items.sort(key=lambda x: x[1].priority)
         elif sort_by == "due":
-            def due_key(pair):
-                d = pair[1].due_date
-                return datetime.datetime.fromisoformat(d) if d else datetime.datetime.max
-            items.sort(key=due_key)
+            items.sort(key=lambda x: x[1]._due_dt)
         else:
             items.sort(key=lambda x: x[0])
-        return items
+        self._view_cache[key] = items
+        return list(items)
 
     def get_task(self, task_id):
-        return self.tasks.get(task_id) or self.completed.get(task_id)
+        return self._by_id.get(task_id)
 
     def delete_task(self, task_id):
-        removed = None
-        if task_id in self.tasks:
-            removed = self.tasks.pop(task_id)
-        elif task_id in self.completed:
-            removed = self.completed.pop(task_id)
-        self.save()
+        removed = self._remove(task_id)
+        if removed:
+            self._append_event({"op": "delete", "id": task_id})
         return removed
 
     def edit_task(self, task_id, **kwargs):
         t = self.get_task(task_id)
         if not t:
             return False
-        for k, v in kwargs.items():
-            if hasattr(t, k) and v is not None:
-                setattr(t, k, v)
-        self.save()
+        fields = {k: v for k, v in kwargs.items() if hasattr(t, k) and v is not None}
+        self._set_fields(t, fields)
+        self._append_event({"op": "edit", "id": task_id, "fields": fields})
         return True
 
     def complete_task(self, task_id):
         if task_id not in self.tasks:
             return False, "Task not found or already completed."
-        t = self.tasks.pop(task_id)
-        t.completed_at = datetime.datetime.now().isoformat()
-        self.completed[task_id] = t
+        t = self.tasks[task_id]
+        self._move_to_completed(t, datetime.datetime.now().isoformat())
         gained = XP_PER_TASK
         prev_xp = self.xp
         self.xp += gained
@@ -151,31 +425,31 @@ class Planner:
             self.level = self.xp // XP_TO_LEVEL + 1
             leveled_up = True
         self._check_achievements_on_completion()
-        self.save()
+        self._append_event({"op": "complete", "id": task_id,
+                            "completed_at": t.completed_at, "xp": self.xp,
+                            "level": self.level,
+                            "achievements": list(self.achievements)})
         return True, {"gained": gained, "leveled_up": leveled_up, "prev_xp": prev_xp}
 
     def _check_achievements_on_completion(self):
-        completed_count = len(self.completed)
-        # milestones
-        milestones = {1: "First Task Done",
-                      5: "Getting Serious",
-                      10: "Study Machine",
-                      25: "Legendary Studier"}
-        for k, name in milestones.items():
-            if completed_count >= k and name not in self.achievements:
-                self.achievements.add(name)
+        completed_count = self._completed_count
+        # milestones crossed since the last check
+        lo = bisect.bisect_right(MILESTONE_THRESHOLDS, self._last_completed_count)
+        hi = bisect.bisect_right(MILESTONE_THRESHOLDS, completed_count)
+        self.achievements.update(MILESTONE_NAMES[lo:hi])
+        self._last_completed_count = completed_count
 
         # level based achievements
-        if self.level >= 2 and "Level 2 Achieved" not in self.achievements:
-            self.achievements.add("Level 2 Achieved")
-        if self.level >= 5 and "Level 5 Achieved" not in self.achievements:
-            self.achievements.add("Level 5 Achieved")
+        lo = bisect.bisect_right(LEVEL_THRESHOLDS, self._last_level)
+        hi = bisect.bisect_right(LEVEL_THRESHOLDS, self.level)
+        self.achievements.update(LEVEL_NAMES[lo:hi])
+        self._last_level = self.level
 
     def stats_summary(self):
-        total_tasks = len(self.tasks) + len(self.completed)
+        total_tasks = self._pending_count + self._completed_count
         return {
-            "pending": len(self.tasks),
-            "completed": len(self.completed),
+            "pending": self._pending_count,
+            "completed": self._completed_count,
             "total": total_tasks,
             "xp": self.xp,
             "level": self.level,
@@ -183,17 +457,29 @@ class Planner:
         }
 
     def search_tasks(self, keyword):
-        keyword = keyword.lower()
+        keyword = keyword.casefold()
+        if keyword in self._search_cache:
+            return list(self._search_cache[keyword])
         results = []
+        haystack = self._haystack
+        # pending first, then completed, as listed in the menus
         for d in (self.tasks, self.completed):
             for tid, t in d.items():
-                if keyword in t.title.lower() or keyword in t.notes.lower() or keyword in t.category.lower():
+                if keyword in haystack[tid]:
                     results.append((tid, t))
-        return results
+        if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+            # evict the oldest query
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[keyword] = results
+        return list(results)
 
 
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+    if LEGACY_CLEAR:
+        os.system("cls" if os.name == "nt" else "clear")
+        return
+    sys.stdout.write("\x1b[H\x1b[2J")
+    sys.stdout.flush()
 
 def print_header():
     print("=" * 60)
@@ -216,26 +502,27 @@ def show_motivational(level_up=False):
         print("\n✨ CONGRATS! You leveled up! ✨\n")
 
 def prompt_date(prompt_text="Due date (YYYY-MM-DD) or leave blank: "):
-    s = input(prompt_text).strip()
-    if s == "":
-        return None
-    try:
-        # validate date format
-        datetime.date.fromisoformat(s)
-        return s
-    except Exception:
-        print("Invalid date format. Use YYYY-MM-DD.")
-        return prompt_date(prompt_text)
+    fromisoformat = datetime.date.fromisoformat
+    while True:
+        s = input(prompt_text).strip()
+        if s == "":
+            return None
+        try:
+            # validate date format
+            fromisoformat(s)
+            return s
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD.")
 
 def prompt_priority():
-    try:
-        p = int(input("Priority (1=High ... 5=Low) [3]: ") or "3")
-        if p < 1 or p > 5:
-            raise ValueError
-        return p
-    except ValueError:
-        print("Enter number between 1 and 5.")
-        return prompt_priority()
+    while True:
+        try:
+            p = int(input("Priority (1=High ... 5=Low) [3]: ") or "3")
+            if p < 1 or p > 5:
+                raise ValueError
+            return p
+        except ValueError:
+            print("Enter number between 1 and 5.")
 
 def wait_enter():
     input("\nPress Enter to continue...")
@@ -265,14 +552,14 @@ def cmd_view(planner, show_completed=False):
     if not items:
         print("No tasks to show.")
     else:
+        buf = []
+        sep = "-" * 50
         for tid, t in items:
             due = f"Due: {t.due_date}" if t.due_date else "No due"
             status = f"Completed at {t.completed_at}" if t.completed_at else "Pending"
-            print(f"[{tid}] {t.title} ({t.category}) - P{t.priority} - {due}")
-            if t.notes:
-                print("    " + nice_wrap("Notes: " + t.notes))
-            print("    " + status)
-            print("-" * 50)
+            notes_line = "\n    " + nice_wrap("Notes: " + t.notes) if t.notes else ""
+            buf.append(f"[{tid}] {t.title} ({t.category}) - P{t.priority} - {due}{notes_line}\n    {status}\n{sep}")
+        sys.stdout.write("\n".join(buf) + "\n")
     wait_enter()
 
 def cmd_complete(planner):
@@ -347,24 +634,24 @@ def cmd_stats(planner):
     clear_screen()
     print_header()
     s = planner.stats_summary()
-    print("Your Stats\n")
-    print(f"Level: {s['level']}    XP: {s['xp']} / {s['level'] * XP_TO_LEVEL}")
-    print(f"Pending tasks: {s['pending']}    Completed tasks: {s['completed']}")
-    print(f"Total tasks: {s['total']}")
-    print("\nAchievements:")
+    buf = ["Your Stats\n",
+           f"Level: {s['level']}    XP: {s['xp']} / {s['level'] * XP_TO_LEVEL}",
+           f"Pending tasks: {s['pending']}    Completed tasks: {s['completed']}",
+           f"Total tasks: {s['total']}",
+           "\nAchievements:"]
     if s["achievements"]:
-        for a in s["achievements"]:
-            print(" - " + a)
+        buf.extend(" - " + a for a in s["achievements"])
     else:
-        print(" No achievements yet. Complete tasks to unlock!")
+        buf.append(" No achievements yet. Complete tasks to unlock!")
     # small progress bar to next level
     xp = s['xp']
     xp_to_next = (s['level'] * XP_TO_LEVEL) - xp
     progress = xp % XP_TO_LEVEL
-    print("\nProgress to next level:")
+    buf.append("\nProgress to next level:")
     bar_len = 30
     filled = int((progress / XP_TO_LEVEL) * bar_len)
-    print("[" + "#" * filled + "-" * (bar_len - filled) + f"] {progress}/{XP_TO_LEVEL} XP")
+    buf.append("[" + "#" * filled + "-" * (bar_len - filled) + f"] {progress}/{XP_TO_LEVEL} XP")
+    sys.stdout.write("\n".join(buf) + "\n")
     wait_enter()
 
 def cmd_search(planner):
@@ -380,12 +667,13 @@ def cmd_search(planner):
     if not results:
         print("No matching tasks.")
     else:
+        buf = []
+        sep = "-" * 40
         for tid, t in results:
             status = "Completed" if tid in planner.completed else "Pending"
-            print(f"[{tid}] {t.title} ({t.category}) - {status}")
-            if t.notes:
-                print("    " + nice_wrap("Notes: " + t.notes))
-            print("-" * 40)
+            notes_line = "\n    " + nice_wrap("Notes: " + t.notes) if t.notes else ""
+            buf.append(f"[{tid}] {t.title} ({t.category}) - {status}{notes_line}\n{sep}")
+        sys.stdout.write("\n".join(buf) + "\n")
     wait_enter()
 
 def cmd_quick_add(planner):
@@ -410,30 +698,43 @@ def cmd_export(planner):
         "level": planner.level,
         "achievements": list(planner.achievements)
     }
+    payload = json.dumps(export, indent=2, ensure_ascii=False)
     with open("tasks_export.json", "w", encoding="utf-8") as f:
-        json.dump(export, f, indent=2, ensure_ascii=False)
+        f.write(payload)
     print("Export complete.")
     wait_enter()
 
+_MENU_TEMPLATE = "\n".join([
+    "Level: {level}    XP: {xp}    Pending: {pending}    Completed: {completed}",
+    "-" * 60,
+    "1. Add Task",
+    "2. Quick Add Task",
+    "3. View Pending Tasks",
+    "4. View Completed Tasks",
+    "5. Complete a Task",
+    "6. Edit a Task",
+    "7. Delete a Task",
+    "8. Stats & Achievements",
+    "9. Search Tasks",
+    "10. Export tasks",
+    "0. Exit",
+    "-" * 60,
+]) + "\n"
+
 def main_menu():
+    if os.name == "nt" and not LEGACY_CLEAR:
+        os.system("")  # turns on ANSI escape handling in the Windows console
     planner = Planner()
+    atexit.register(planner.flush)
     while True:
         clear_screen()
         print_header()
-        print(f"Level: {planner.level}    XP: {planner.xp}    Pending: {len(planner.tasks)}    Completed: {len(planner.completed)}")
-        print("-" * 60)
-        print("1. Add Task")
-        print("2. Quick Add Task")
-        print("3. View Pending Tasks")
-        print("4. View Completed Tasks")
-        print("5. Complete a Task")
-        print("6. Edit a Task")
-        print("7. Delete a Task")
-        print("8. Stats & Achievements")
-        print("9. Search Tasks")
-        print("10. Export tasks")
-        print("0. Exit")
-        print("-" * 60)
+        sys.stdout.write(_MENU_TEMPLATE.format_map({
+            "level": planner.level,
+            "xp": planner.xp,
+            "pending": len(planner.tasks),
+            "completed": len(planner.completed),
+        }))
         choice = input("Choose an option: ").strip()
         if choice == "1":
             cmd_add(planner)
@@ -0,0 +1,205 @@
+import json
+
+import pytest
+
+import study_planner
+from study_planner import Planner, DATA_FILE, LOG_FILE
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_replayed_add_for_known_id_is_ignored():
+    p = Planner()
+    a = p.add_task("A")
+    p.add_task("B")
+    p.complete_task(a)
+    p.flush()
+    with open(LOG_FILE, "rb") as f:
+        events = f.read().splitlines(keepends=True)[1:]  # drop the generation header
+    p.save()
+    # a headerless log is replayed on top of the snapshot that already holds it
+    with open(LOG_FILE, "wb") as f:
+        f.writelines(events)
+    q = Planner()
+    assert q.stats_summary()["completed"] == 1
+    assert q.stats_summary()["total"] == 2
+    assert [t.title for _, t in q.view_tasks()] == ["B"]
+
+
+@pytest.mark.parametrize("bad_line", [
+    "null",
+    "[]",
+    '{"op": "edit", "id": 1}',
+    '{"op": "edit", "id": 1, "fields": {"priority": "high"}}',
+    '{"op": "complete", "id": 1}',
+    '{"op": "bogus"}',
+])
+def test_malformed_event_ends_the_log_without_losing_data(bad_line):
+    p = Planner()
+    for title in ("A", "B", "C"):
+        p.add_task(title)
+    p.save()
+    p.edit_task(1, title="A2")
+    p.flush()
+    with open(LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(bad_line + "\n")
+        f.write('{"op": "delete", "id": 2}\n')
+    q = Planner()
+    assert [t.title for t in q.tasks.values()] == ["A2", "B", "C"]
+    q.add_task("D")
+    q.flush()
+    assert [t.title for t in Planner().tasks.values()] == ["A2", "B", "C", "D"]
+
+
+def test_torn_log_line_is_truncated_before_new_appends():
+    p = Planner()
+    p.add_task("A")
+    p.flush()
+    with open(LOG_FILE, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "task": {"id": 9')
+    q = Planner()
+    q.add_task("B")
+    q.add_task("C")
+    q.flush()
+    r = Planner()
+    assert [t.title for t in r.tasks.values()] == ["A", "B", "C"]
+    assert r.next_id == 4
+
+
+def test_log_from_before_the_current_snapshot_is_skipped():
+    p = Planner()
+    a = p.add_task("A")
+    p.add_task("B")
+    p.complete_task(a)
+    p.flush()
+    with open(LOG_FILE, "rb") as f:
+        log = f.read()
+    p.save()
+    # crash after the snapshot swap but before the log was reset
+    with open(LOG_FILE, "wb") as f:
+        f.write(log)
+    q = Planner()
+    # only the generation check discards the stale log outright
+    with open(LOG_FILE, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"op": "gen", "gen": q._log_gen}]
+    assert q.stats_summary()["completed"] == 1
+    assert q.stats_summary()["total"] == 2
+    assert q.view_tasks() == [(2, q.get_task(2))]
+    q.add_task("C")
+    q.flush()
+    assert [t.title for t in Planner().tasks.values()] == ["B", "C"]
+
+
+def snapshot_state(p):
+    return (
+        {tid: t.to_dict() for tid, t in p.tasks.items()},
+        {tid: t.to_dict() for tid, t in p.completed.items()},
+        p.next_id, p.xp, p.level, sorted(p.achievements),
+        p.stats_summary(),
+        p.view_tasks(sort_by="priority"),
+        p.view_tasks(sort_by="due"),
+    )
+
+
+def comparable(state):
+    # view entries hold Task objects; compare them by id
+    *head, by_priority, by_due = state
+    return (*head, [tid for tid, _ in by_priority], [tid for tid, _ in by_due])
+
+
+def test_buffered_events_round_trip_through_flush():
+    p = Planner()
+    ids = [p.add_task(f"Task {i}", "Study", f"2025-10-{i + 1:02d}", i % 5 + 1, "notes")
+           for i in range(study_planner.FLUSH_EVERY + 3)]
+    p.edit_task(ids[0], title="Renamed", due_date="2025-01-01", priority=5)
+    p.complete_task(ids[1])
+    p.complete_task(ids[2])
+    p.delete_task(ids[3])
+    p.delete_task(ids[2])
+    p.edit_task(ids[4], notes="more notes")
+    assert p._pending_events  # some events are still only in memory
+    p.flush()
+    assert comparable(snapshot_state(Planner())) == comparable(snapshot_state(p))
+
+
+def test_partially_written_batch_keeps_complete_lines():
+    p = Planner()
+    p.add_task("A")
+    p.add_task("B")
+    p.flush()
+    with open(LOG_FILE, "rb") as f:
+        log = f.read()
+    with open(LOG_FILE, "wb") as f:
+        f.write(log[:-5])  # crash part way through the last line
+    q = Planner()
+    assert [t.title for t in q.tasks.values()] == ["A"]
+    q.add_task("C")
+    q.flush()
+    assert [t.title for t in Planner().tasks.values()] == ["A", "C"]
+
+
+def test_search_lists_pending_before_completed_across_restarts():
+    p = Planner()
+    a = p.add_task("math one")
+    p.add_task("math two")
+    p.complete_task(a)
+    p.add_task("math three")
+    expected = ["math two", "math three", "math one"]
+    assert [t.title for _, t in p.search_tasks("math")] == expected
+    p.flush()
+    assert [t.title for _, t in Planner().search_tasks("math")] == expected
+
+
+def test_unreadable_snapshot_is_moved_aside_not_overwritten():
+    with open(DATA_FILE, "w", encoding="utf-8") as f:
+        f.write('{"tasks": {"1": ')
+    p = Planner()
+    assert p.tasks == {}
+    with open(DATA_FILE + ".bad", encoding="utf-8") as f:
+        assert f.read() == '{"tasks": {"1": '
+
+
+def test_due_dates_with_offsets_load_and_sort():
+    with open(DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"next_id": 4, "tasks": {
+            "1": {"id": 1, "title": "A", "due_date": "2025-10-01T09:00+05:30"},
+            "2": {"id": 2, "title": "B", "due_date": "2025-09-01"},
+            "3": {"id": 3, "title": "C", "due_date": None},
+        }}, f)
+    p = Planner()
+    assert [t.title for _, t in p.view_tasks(sort_by="due")] == ["B", "A", "C"]
+
+
+def test_view_cache_reflects_every_mutation():
+    p = Planner()
+    a = p.add_task("A", priority=3)
+    b = p.add_task("B", priority=4)
+    ids = lambda **kw: [tid for tid, _ in p.view_tasks(**kw)]
+    assert ids() == [a, b]
+    p.edit_task(b, priority=1)
+    assert ids() == [b, a]
+    p.complete_task(b)
+    assert ids() == [a]
+    assert ids(show_completed=True) == [b]
+    p.delete_task(a)
+    assert ids() == []
+    c = p.add_task("C")
+    assert ids() == [c]
+
+
+def test_search_cache_reflects_every_mutation():
+    p = Planner()
+    a = p.add_task("math homework")
+    assert [tid for tid, _ in p.search_tasks("math")] == [a]
+    p.edit_task(a, title="physics homework")
+    assert p.search_tasks("math") == []
+    assert [tid for tid, _ in p.search_tasks("physics")] == [a]
+    b = p.add_task("physics lab")
+    assert [tid for tid, _ in p.search_tasks("physics")] == [a, b]
+    p.complete_task(a)
+    assert [tid for tid, _ in p.search_tasks("physics")] == [b, a]
+    p.delete_task(b)
+    assert [tid for tid, _ in p.search_tasks("physics")] == [a]